@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import hashlib
 import json
+import os
 import sys
 import uuid
 import argparse
@@ -11,11 +13,44 @@ import re
 import platform
 from pathlib import Path
 from itertools import chain
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 import shutil
 
 g_indent_unit = "\t"
-g_version = ""
-g_build_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+g_script_dir = Path(sys.argv[0]).resolve().parent
+
+# Version/build-date context threaded explicitly through the generators
+# instead of living in mutable module globals.
+BuildInfo = namedtuple("BuildInfo", ["version", "build_date"])
+
+# <Component Id="Product.Registry.DefaultIcon" Guid="6DBF2690-0955-4C6A-940F-634DDA503F49">
+g_component_guid_pattern = re.compile(r'(Component\b[^>]*?Guid=")[^"]+(")')
+g_version_pattern = re.compile(r"\d+\.\d+\.\d+.*")
+g_build_date_pattern = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}")
+
+# SHA-1 state seeded with the constant uuid5 namespace, copied per use.
+g_ns_oid_sha1 = hashlib.sha1(uuid.NAMESPACE_OID.bytes)
+
+
+def uuid5_oid(name):
+    """Same result as uuid.uuid5(uuid.NAMESPACE_OID, name) without
+    re-hashing the namespace bytes on every call."""
+    h = g_ns_oid_sha1.copy()
+    h.update(name.encode("utf-8"))
+    digest = bytearray(h.digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50
+    digest[8] = (digest[8] & 0x3F) | 0x80
+    return uuid.UUID(bytes=bytes(digest))
+
+# Don't generate Component Id and File Id like 'Component_{idx}' and 'File_{idx}'
+# because it will cause error
+# "Error WIX0130	The primary key 'xxxx' is duplicated in table 'Directory'"
+g_component_template = (
+    '{indent}<Component Guid="{guid}" {dir_attr}>\n'
+    '{indent}{indent_unit}<File Source="{source}" KeyPath="yes" Checksum="yes" />\n'
+    "{indent}</Component>\n"
+)
 
 # Replace the following links with your own in the custom arp properties.
 # https://learn.microsoft.com/en-us/windows/win32/msi/property-reference
@@ -39,6 +74,11 @@ g_arpsystemcomponent = {
     },
 }
 
+def real_path(relative):
+    """Resolve a path against the script directory, computed once at load."""
+    return g_script_dir.joinpath(relative)
+
+
 def default_revision_version():
     return int(datetime.datetime.now().timestamp() / 60)
 
@@ -91,72 +131,130 @@ def make_parser():
     return parser
 
 
-def read_lines_and_start_index(file_path, tag_start, tag_end):
+def read_content_and_insert_pos(file_path, tag_start, tag_end):
     with open(file_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    index_start = -1
-    index_end = -1
-    for i, line in enumerate(lines):
-        if tag_start in line:
-            index_start = i
-        if tag_end in line:
-            index_end = i
-
-    if index_start == -1:
+        content = f.read()
+
+    # Locate both tags with C-level searches instead of scanning per line.
+    pos_start = content.find(tag_start)
+    if pos_start == -1:
         print(f'Error: start tag "{tag_start}" not found')
         return None, None
-    if index_end == -1:
+    if content.find(tag_end, pos_start + len(tag_start)) == -1:
         print(f'Error: end tag "{tag_end}" not found')
         return None, None
-    return lines, index_start
 
-
-def insert_components_between_tags(lines, index_start, app_name, dist_dir):
+    # Insert right after the line holding the start tag.
+    insert_pos = content.find("\n", pos_start) + 1
+    return content, insert_pos
+
+
+def gen_uuid4_strs(count):
+    """Generate `count` random version-4 UUID strings from a single
+    os.urandom read instead of one kernel RNG call per uuid.uuid4()."""
+    raw = bytearray(os.urandom(16 * count))
+    uuids = []
+    for offset in range(0, len(raw), 16):
+        # Set the RFC 4122 version and variant bits.
+        raw[offset + 6] = (raw[offset + 6] & 0x0F) | 0x40
+        raw[offset + 8] = (raw[offset + 8] & 0x3F) | 0x80
+        h = raw[offset : offset + 16].hex()
+        uuids.append(f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}")
+    return uuids
+
+
+def iter_files(root):
+    """Yield an os.DirEntry for every regular file under root, without the
+    Path allocation and extra stat calls of Path.glob("**/*"). Symlinks are
+    not followed: a linked directory could loop the walk forever, and a
+    linked payload should not be packaged as a file."""
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+# Below this many files a worker pool costs more to spawn than it saves.
+g_parallel_min_files = 1024
+
+
+def format_components_chunk(chunk):
+    """Format one shard of (entry_path, subdir) tuples into component lines."""
     indent = g_indent_unit * 3
-    path = Path(dist_dir)
-    idx = 1
-    for file_path in path.glob("**/*"):
-        if file_path.is_file():
-            if file_path.name.lower() == f"{app_name}.exe".lower():
-                continue
-
-            subdir = str(file_path.parent.relative_to(path))
-            dir_attr = ""
-            if subdir != ".":
-                dir_attr = f'Subdirectory="{subdir}"'
-
-            # Don't generate Component Id and File Id like 'Component_{idx}' and 'File_{idx}'
-            # because it will cause error
-            # "Error WIX0130	The primary key 'xxxx' is duplicated in table 'Directory'"
-            to_insert_lines = f"""
-{indent}<Component Guid="{uuid.uuid4()}" {dir_attr}>
-{indent}{g_indent_unit}<File Source="{file_path.as_posix()}" KeyPath="yes" Checksum="yes" />
-{indent}</Component>
-"""
-            lines.insert(index_start + 1, to_insert_lines[1:])
-            index_start += 1
-            idx += 1
-    return True
+    component_lines = []
+    for (entry_path, subdir), guid in zip(chunk, gen_uuid4_strs(len(chunk))):
+        dir_attr = ""
+        if subdir != "":
+            dir_attr = f'Subdirectory="{subdir}"'
+
+        component_lines.append(
+            g_component_template.format(
+                indent=indent,
+                indent_unit=g_indent_unit,
+                guid=guid,
+                dir_attr=dir_attr,
+                source=entry_path.replace(os.sep, "/"),
+            )
+        )
+    return component_lines
 
 
-def gen_auto_component(app_name, dist_dir):
+def scan_dist(dist_dir, app_name):
+    """Walk dist_dir once, accumulating the total payload size (for
+    EstimatedSize) and the auto-generated component lines in the same pass."""
+    path = Path(dist_dir)
+    total_size = 0
+    files = []
+    skip_name = f"{app_name}.exe".lower()
+    for entry in iter_files(path):
+        total_size += entry.stat(follow_symlinks=False).st_size
+        if entry.name.lower() == skip_name:
+            continue
+        files.append(entry.path)
+
+    # Paths from iter_files all start with the dist dir, so the subdirectory
+    # is just a string suffix; no need for Path.relative_to per file.
+    prefix_len = len(str(path)) + len(os.sep)
+    items = [(p, os.path.dirname(p)[prefix_len:]) for p in files]
+
+    workers = os.cpu_count() or 1
+    if len(items) < g_parallel_min_files or workers == 1:
+        return total_size, format_components_chunk(items)
+
+    # Formatting is CPU-bound and per-file independent; shard across
+    # processes and concatenate the results in order.
+    chunk_size = (len(items) + workers - 1) // workers
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    component_lines = []
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        for part in executor.map(format_components_chunk, chunks):
+            component_lines.extend(part)
+    return total_size, component_lines
+
+
+def gen_auto_component(component_lines):
+    def func():
+        return "".join(component_lines)
+
     return gen_content_between_tags(
         "Package/Components/RustDesk.wxs",
         "<!--$AutoComonentStart$-->",
         "<!--$AutoComponentEnd$-->",
-        lambda lines, index_start: insert_components_between_tags(
-            lines, index_start, app_name, dist_dir
-        ),
+        func,
     )
 
 
-def gen_pre_vars(args, dist_dir):
-    def func(lines, index_start):
-        upgrade_code = uuid.uuid5(uuid.NAMESPACE_OID, app_name + ".exe")
+def gen_pre_vars(args, dist_dir, build_info):
+    def func():
+        upgrade_code = uuid5_oid(app_name + ".exe")
 
         indent = g_indent_unit * 1
         to_insert_lines = [
-            f'{indent}<?define Version="{g_version}" ?>\n',
+            f'{indent}<?define Version="{build_info.version}" ?>\n',
             f'{indent}<?define Manufacturer="{args.manufacturer}" ?>\n',
             f'{indent}<?define Product="{args.app_name}" ?>\n',
             f'{indent}<?define Description="{args.app_name} Installer" ?>\n',
@@ -164,15 +262,13 @@ def gen_pre_vars(args, dist_dir):
             f'{indent}<?define RegKeyRoot=".$(var.ProductLower)" ?>\n',
             f'{indent}<?define RegKeyInstall="$(var.RegKeyRoot)\\Install" ?>\n',
             f'{indent}<?define BuildDir="{dist_dir}" ?>\n',
-            f'{indent}<?define BuildDate="{g_build_date}" ?>\n',
+            f'{indent}<?define BuildDate="{build_info.build_date}" ?>\n',
             "\n",
             f"{indent}<!-- The UpgradeCode must be consistent for each product. ! -->\n"
             f'{indent}<?define UpgradeCode = "{upgrade_code}" ?>\n',
         ]
 
-        for i, line in enumerate(to_insert_lines):
-            lines.insert(index_start + i + 1, line)
-        return lines
+        return "".join(to_insert_lines)
 
     return gen_content_between_tags(
         "Package/Includes.wxi", "<!--$PreVarsStart$-->", "<!--$PreVarsEnd$-->", func
@@ -180,17 +276,19 @@ def gen_pre_vars(args, dist_dir):
 
 
 def replace_app_name_in_langs(app_name):
-    langs_dir = Path(sys.argv[0]).parent.joinpath("Package/Language")
+    if app_name == "RustDesk":
+        return
+    langs_dir = real_path("Package/Language")
     for file_path in langs_dir.glob("*.wxl"):
         with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        for i, line in enumerate(lines):
-            lines[i] = line.replace("RustDesk", app_name)
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
+            content = f.read()
+        new_content = content.replace("RustDesk", app_name)
+        if new_content != content:
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(new_content)
 
 def replace_app_name_in_custom_actions(app_name):
-    custion_actions_dir = Path(sys.argv[0]).parent.joinpath("CustomActions")
+    custion_actions_dir = real_path("CustomActions")
     for file_path in chain(custion_actions_dir.glob("*.cpp"), custion_actions_dir.glob("*.h")):
         with open(file_path, "r", encoding="utf-8") as f:
             lines = f.readlines()
@@ -201,11 +299,11 @@ def replace_app_name_in_custom_actions(app_name):
         with open(file_path, "w", encoding="utf-8") as f:
             f.writelines(lines)
 
-def gen_upgrade_info():
-    def func(lines, index_start):
+def gen_upgrade_info(build_info):
+    def func():
         indent = g_indent_unit * 3
 
-        vs = g_version.split(".")
+        vs = build_info.version.split(".")
         major = vs[0]
         upgrade_id = uuid.uuid4()
         to_insert_lines = [
@@ -214,9 +312,7 @@ def gen_upgrade_info():
             f"{indent}</Upgrade>\n",
         ]
 
-        for i, line in enumerate(to_insert_lines):
-            lines.insert(index_start + i + 1, line)
-        return lines
+        return "".join(to_insert_lines)
 
     return gen_content_between_tags(
         "Package/Fragments/Upgrades.wxs",
@@ -227,7 +323,7 @@ def gen_upgrade_info():
 
 
 def gen_custom_dialog_bitmaps():
-    def func(lines, index_start):
+    def func():
         indent = g_indent_unit * 2
 
         # https://wixtoolset.org/docs/tools/wixext/wixui/#customizing-a-dialog-set
@@ -239,16 +335,17 @@ def gen_custom_dialog_bitmaps():
             "WixUINewIco",
             "WixUIUpIco",
         ]
+        # One scandir instead of one stat per variable.
+        res_dir = Path("Package/Resources")
+        res_names = {e.name for e in os.scandir(res_dir)} if res_dir.is_dir() else set()
         to_insert_lines = []
         for var in vars:
-            if Path(f"Package/Resources/{var}.bmp").exists():
+            if f"{var}.bmp" in res_names:
                 to_insert_lines.append(
                     f'{indent}<WixVariable Id="{var}" Value="Resources\\{var}.bmp" />\n'
                 )
 
-        for i, line in enumerate(to_insert_lines):
-            lines.insert(index_start + i + 1, line)
-        return lines
+        return "".join(to_insert_lines)
 
     return gen_content_between_tags(
         "Package/Package.wxs",
@@ -259,7 +356,7 @@ def gen_custom_dialog_bitmaps():
 
 
 def gen_custom_ARPSYSTEMCOMPONENT_False(args):
-    def func(lines, index_start):
+    def func():
         indent = g_indent_unit * 2
 
         lines_new = []
@@ -279,9 +376,7 @@ def gen_custom_ARPSYSTEMCOMPONENT_False(args):
                     f'{indent}<Property Id="{v["msi"]}" Value="{v["v"]}" />\n'
                 )
 
-        for i, line in enumerate(lines_new):
-            lines.insert(index_start + i + 1, line)
-        return lines
+        return "".join(lines_new)
 
     return gen_content_between_tags(
         "Package/Fragments/AddRemoveProperties.wxs",
@@ -291,20 +386,10 @@ def gen_custom_ARPSYSTEMCOMPONENT_False(args):
     )
 
 
-def get_folder_size(folder_path):
-    total_size = 0
-
-    folder = Path(folder_path)
-    for file in folder.glob("**/*"):
-        if file.is_file():
-            total_size += file.stat().st_size
-
-    return total_size
-
-
-def gen_custom_ARPSYSTEMCOMPONENT_True(args, dist_dir):
-    def func(lines, index_start):
+def gen_custom_ARPSYSTEMCOMPONENT_True(args, estimated_size, build_info):
+    def func():
         indent = g_indent_unit * 5
+        version = build_info.version
 
         lines_new = []
         lines_new.append(
@@ -317,7 +402,7 @@ def gen_custom_ARPSYSTEMCOMPONENT_True(args, dist_dir):
             f'{indent}<RegistryValue Type="string" Name="DisplayIcon" Value="[INSTALLFOLDER_INNER]{args.app_name}.exe" />\n'
         )
         lines_new.append(
-            f'{indent}<RegistryValue Type="string" Name="DisplayVersion" Value="{g_version}" />\n'
+            f'{indent}<RegistryValue Type="string" Name="DisplayVersion" Value="{version}" />\n'
         )
         lines_new.append(
             f'{indent}<RegistryValue Type="string" Name="Publisher" Value="{args.manufacturer}" />\n'
@@ -336,7 +421,6 @@ def gen_custom_ARPSYSTEMCOMPONENT_True(args, dist_dir):
             f'{indent}<RegistryValue Type="integer" Name="Language" Value="[ProductLanguage]" />\n'
         )
 
-        estimated_size = get_folder_size(dist_dir)
         lines_new.append(
             f'{indent}<RegistryValue Type="integer" Name="EstimatedSize" Value="{estimated_size}" />\n'
         )
@@ -354,10 +438,10 @@ def gen_custom_ARPSYSTEMCOMPONENT_True(args, dist_dir):
             f'{indent}<RegistryValue Type="expandable" Name="QuietUninstallString" Value="MsiExec.exe /qn /X [ProductCode]" />\n'
         )
 
-        vs = g_version.split(".")
+        vs = version.split(".")
         major, minor, build = vs[0], vs[1], vs[2]
         lines_new.append(
-            f'{indent}<RegistryValue Type="string" Name="Version" Value="{g_version}" />\n'
+            f'{indent}<RegistryValue Type="string" Name="Version" Value="{version}" />\n'
         )
         lines_new.append(
             f'{indent}<RegistryValue Type="integer" Name="VersionMajor" Value="{major}" />\n'
@@ -379,9 +463,7 @@ def gen_custom_ARPSYSTEMCOMPONENT_True(args, dist_dir):
                     f'{indent}<RegistryValue Type="{t}" Name="{k}" Value="{v["v"]}" />\n'
                 )
 
-        for i, line in enumerate(lines_new):
-            lines.insert(index_start + i + 1, line)
-        return lines
+        return "".join(lines_new)
 
     return gen_content_between_tags(
         "Package/Components/Regs.wxs",
@@ -391,7 +473,7 @@ def gen_custom_ARPSYSTEMCOMPONENT_True(args, dist_dir):
     )
 
 
-def gen_custom_ARPSYSTEMCOMPONENT(args, dist_dir):
+def gen_custom_ARPSYSTEMCOMPONENT(args, estimated_size, build_info):
     try:
         custom_arp = json.loads(args.custom_arp)
         g_arpsystemcomponent.update(custom_arp)
@@ -400,12 +482,12 @@ def gen_custom_ARPSYSTEMCOMPONENT(args, dist_dir):
         return False
 
     if args.arp:
-        return gen_custom_ARPSYSTEMCOMPONENT_True(args, dist_dir)
+        return gen_custom_ARPSYSTEMCOMPONENT_True(args, estimated_size, build_info)
     else:
         return gen_custom_ARPSYSTEMCOMPONENT_False(args)
 
 def gen_conn_type(args):
-    def func(lines, index_start):
+    def func():
         indent = g_indent_unit * 3
 
         lines_new = []
@@ -414,9 +496,7 @@ def gen_conn_type(args):
                 f"""{indent}<Property Id="CC_CONNECTION_TYPE" Value="{args.conn_type}" />\n"""
             )
 
-        for i, line in enumerate(lines_new):
-            lines.insert(index_start + i + 1, line)
-        return lines
+        return "".join(lines_new)
 
     return gen_content_between_tags(
         "Package/Fragments/AddRemoveProperties.wxs",
@@ -426,22 +506,20 @@ def gen_conn_type(args):
     )
 
 def gen_content_between_tags(filename, tag_start, tag_end, func):
-    target_file = Path(sys.argv[0]).parent.joinpath(filename)
-    lines, index_start = read_lines_and_start_index(target_file, tag_start, tag_end)
-    if lines is None:
+    target_file = real_path(filename)
+    content, insert_pos = read_content_and_insert_pos(target_file, tag_start, tag_end)
+    if content is None:
         return False
 
-    func(lines, index_start)
-
     with open(target_file, "w", encoding="utf-8") as f:
-        f.writelines(lines)
+        f.write(content[:insert_pos] + func() + content[insert_pos:])
 
     return True
 
 
 def prepare_resources():
-    icon_src = Path(sys.argv[0]).parent.joinpath("../icon.ico")
-    icon_dst = Path(sys.argv[0]).parent.joinpath("Package/Resources/icon.ico")
+    icon_src = real_path("../icon.ico")
+    icon_dst = real_path("Package/Resources/icon.ico")
     if icon_src.exists():
         icon_dst.parent.mkdir(parents=True, exist_ok=True)
         shutil.copy(icon_src, icon_dst)
@@ -452,47 +530,51 @@ def prepare_resources():
         return False
 
 
-def init_global_vars(dist_dir, app_name, args):
+def init_build_info(dist_dir, app_name, args):
+    """Return the BuildInfo for this run, or None if it cannot be determined."""
     dist_app = dist_dir.joinpath(app_name + ".exe")
 
-    def read_process_output(args):
-        process = subprocess.Popen(
-            f"{dist_app} {args}",
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            shell=True,
-        )
-        output, _ = process.communicate()
+    def read_process_output(arg):
+        # The app handles one query flag per invocation, so --version and
+        # --build-date need separate runs; at least spawn it directly
+        # instead of going through a shell each time.
+        try:
+            process = subprocess.Popen(
+                [str(dist_app), arg],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+            output, _ = process.communicate()
+        except OSError:
+            # A missing or unrunnable exe falls through to the pattern
+            # checks below, which print the clean "not found" diagnostics.
+            return ""
         return output.decode("utf-8").strip()
 
-    global g_version
-    global g_build_date
-    g_version = args.version.replace("-", ".")
-    if g_version == "":
-        g_version = read_process_output("--version")
-    version_pattern = re.compile(r"\d+\.\d+\.\d+.*")
-    if not version_pattern.match(g_version):
-        print(f"Error: version {g_version} not found in {dist_app}")
-        return False
-    if g_version.count(".") == 2:
+    version = args.version.replace("-", ".")
+    if version == "":
+        version = read_process_output("--version")
+    if not g_version_pattern.match(version):
+        print(f"Error: version {version} not found in {dist_app}")
+        return None
+    if version.count(".") == 2:
         # https://github.com/dotnet/runtime/blob/5535e31a712343a63f5d7d796cd874e563e5ac14/src/libraries/System.Private.CoreLib/src/System/Version.cs
         if args.revision_version < 0 or args.revision_version > 2147483647:
-            raise ValueError(f"Invalid revision version: {args.revision_version}")    
-        g_version = f"{g_version}.{args.revision_version}"
+            raise ValueError(f"Invalid revision version: {args.revision_version}")
+        version = f"{version}.{args.revision_version}"
 
-    g_build_date = read_process_output("--build-date")
-    build_date_pattern = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}")
-    if not build_date_pattern.match(g_build_date):
-        print(f"Error: build date {g_build_date} not found in {dist_app}")
-        return False
+    build_date = read_process_output("--build-date")
+    if not g_build_date_pattern.match(build_date):
+        print(f"Error: build date {build_date} not found in {dist_app}")
+        return None
 
-    return True
+    return BuildInfo(version=version, build_date=build_date)
 
 
 def update_license_file(app_name):
     if app_name == "RustDesk":
         return
-    license_file = Path(sys.argv[0]).parent.joinpath("Package/License.rtf")
+    license_file = real_path("Package/License.rtf")
     with open(license_file, "r", encoding="utf-8") as f:
         license_content = f.read()
     license_content = license_content.replace("website rustdesk.com and other ", "")
@@ -503,19 +585,22 @@ def update_license_file(app_name):
 
 
 def replace_component_guids_in_wxs():
-    langs_dir = Path(sys.argv[0]).parent.joinpath("Package")
-    for file_path in langs_dir.glob("**/*.wxs"):
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        # <Component Id="Product.Registry.DefaultIcon" Guid="6DBF2690-0955-4C6A-940F-634DDA503F49">
-        for i, line in enumerate(lines):
-            match = re.search(r'Component.+Guid="([^"]+)"', line)
-            if match:
-                lines[i] = re.sub(r'Guid="[^"]+"', f'Guid="{uuid.uuid4()}"', line)
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
+    package_dir = real_path("Package")
+    for file_path in package_dir.glob("**/*.wxs"):
+        data = file_path.read_bytes()
+        # Cheap byte-level pre-filter: skip files that cannot contain a
+        # component GUID without decoding or running the regex.
+        if b"Component" not in data or b'Guid="' not in data:
+            continue
+
+        content = data.decode("utf-8")
+        guids = iter(gen_uuid4_strs(len(g_component_guid_pattern.findall(content))))
+        new_content = g_component_guid_pattern.sub(
+            lambda m: f"{m.group(1)}{next(guids)}{m.group(2)}", content
+        )
+        if new_content != content:
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(new_content)
 
 
 if __name__ == "__main__":
@@ -523,32 +608,35 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     app_name = args.app_name
-    dist_dir = Path(sys.argv[0]).parent.joinpath(args.dist_dir).resolve()
+    dist_dir = real_path(args.dist_dir).resolve()
 
     if not prepare_resources():
         sys.exit(-1)
 
-    if not init_global_vars(dist_dir, app_name, args):
+    build_info = init_build_info(dist_dir, app_name, args)
+    if build_info is None:
         sys.exit(-1)
 
     update_license_file(app_name)
 
-    if not gen_pre_vars(args, dist_dir):
+    if not gen_pre_vars(args, dist_dir, build_info):
         sys.exit(-1)
 
     if app_name != "RustDesk":
         replace_component_guids_in_wxs()
 
-    if not gen_upgrade_info():
+    if not gen_upgrade_info(build_info):
         sys.exit(-1)
 
-    if not gen_custom_ARPSYSTEMCOMPONENT(args, dist_dir):
+    total_size, component_lines = scan_dist(dist_dir, app_name)
+
+    if not gen_custom_ARPSYSTEMCOMPONENT(args, total_size, build_info):
         sys.exit(-1)
 
     if not gen_conn_type(args):
         sys.exit(-1)
 
-    if not gen_auto_component(app_name, dist_dir):
+    if not gen_auto_component(component_lines):
         sys.exit(-1)
 
     if not gen_custom_dialog_bitmaps():